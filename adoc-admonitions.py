@@ -5,7 +5,8 @@ Pandoc filter that processes asciidoc-style admonitions and encloses them in a D
 a specified class
 
 The admonitions are uppercase words appearing in the first column of a paragraph followed by a
-colon (:) and a space. For example:
+colon (:) and a space. Keywords with several words (e.g. `Important note`) can be given in the
+metadata too, but they make the filter stringify every paragraph. For example:
 
 NOTE: this is a note
 
@@ -48,6 +49,10 @@ environment like:
 
     pip3 install panflute
 
+   Optionally, install orjson to write the resulting pandoc document faster
+
+    pip3 install orjson
+
 3. Download and place the file in directory:
 
     ~/.pandoc/filters
@@ -64,8 +69,16 @@ environment like:
 
 """
 
+import sys
 from panflute import *
 
+# orjson is optional. When installed it writes the resulting JSON document,
+# otherwise panflute does
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # The default filter name to appear in the metadata block
 FILTERNAME= "adoc-admonition"
 # Admonition mapping. Key is the ADMONITION name (case is considered) and the
@@ -80,7 +93,23 @@ ADMONITIONS = {
         }
 
 def prepare(doc):
-    pass
+    """
+    Merges the default ADMONITIONS with the document metadata (doc._admonitions)
+    and builds the keyword trie used by action (doc._admon_trie).
+    Keywords with spaces span several inlines and cannot be matched on the
+    first Str of the paragraph, so they are kept apart (doc._admon_multiword)
+    :param doc:
+    :return:
+    """
+    doc._admonitions = {**ADMONITIONS, **doc.get_metadata(FILTERNAME, {})}
+    single_word = {}
+    doc._admon_multiword = {}
+    for keyword, classname in doc._admonitions.items():
+        if len(keyword.split()) > 1:
+            doc._admon_multiword[keyword] = classname
+        else:
+            single_word[keyword] = classname
+    doc._admon_trie = build_keyword_trie(single_word)
 
 
 def action(elem, doc):
@@ -94,41 +123,43 @@ def action(elem, doc):
     :return:
     """
 
-    # Skip non Div elements
-    if not isinstance(elem, Para):
+    # Skip non Para elements
+    if type(elem) is not Para:
         return
 
-    #
-    # getting the document metadata. To guarantee that this procedure is executed only once
-    # check if variable META is defined in the global scope. Then gets the variable
-    # from markdown metadata and merge with the default LINKS dict
-    #
-    if 'META' not in globals():
-        META = doc.get_metadata(FILTERNAME, {})
-        # Merging admonition names and types with metadata
-        admonitions = {**ADMONITIONS, **META}
-        globals()['META'] = META
+    # Checking the first inline before stringifying the whole paragraph.
+    # An admonition starts with a Str holding the keyword and the colon (NOTE:)
+    match = None
+    if len(elem.content) and type(elem.content[0]) is Str:
+        match = match_keyword(doc._admon_trie, elem.content[0].text)
+    # Multi-word keywords can only be found in the stringified paragraph
+    if match is None and not doc._admon_multiword:
+        return
 
     # Getting the text
     text = stringify(elem)
     # Skip empty lines
     if not len(text):
         return
-    # Getting the first word
-    first_word = text.split(": ", 1)[0]
-    if first_word not in admonitions:
+    # Getting the first word. The remaining text comes along with the partition
+    first_word, sep, newtext = text.partition(": ")
+    if not sep:
         return
+    if match is not None:
+        keyword, classname = match
+        if first_word != keyword:
+            return
+    elif first_word in doc._admon_multiword:
+        classname = doc._admon_multiword[first_word]
     else:
-        classname = admonitions[first_word]
-
+        return
 
-    newtext = text.removeprefix(first_word+": ")
     # Creating a RawBlock with a Latex environment
     if doc.format in ["latex", "beamer"]:
         return [
-                RawBlock(u'\\begin{' + classname + u'}', "tex"),
+                RawBlock(f"\\begin{{{classname}}}", "tex"),
                 Para(Str(newtext)),
-                RawBlock(u'\\end{' + classname + u'}', "tex"),
+                RawBlock(f"\\end{{{classname}}}", "tex"),
         ]
 
     div = Div(Para(Str(newtext)), classes=[classname])
@@ -141,6 +172,55 @@ def finalize(doc):
     pass
 
 
+def build_keyword_trie(admonitions):
+    """
+    Builds a character trie with the admonition keywords. Each node is a dict
+    keyed by the next character and the node ending a keyword holds the
+    (keyword, classname) tuple under the None key
+    :param admonitions: dict mapping the keywords to the classnames
+    :return: the trie root
+    """
+    trie = {}
+    for keyword, classname in admonitions.items():
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[None] = (keyword, classname)
+    return trie
+
+
+def match_keyword(trie, text):
+    """
+    Walks the trie over text, which should contain only a keyword followed by
+    a colon (NOTE:). The walk stops at the first character not in the trie,
+    so most paragraphs are rejected after looking at a single character
+    :param trie: the trie created by build_keyword_trie
+    :param text: the text of the first Str in the paragraph
+    :return: the (keyword, classname) tuple or None if no keyword matches
+    """
+    # The trie root works as a dispatch table on the first character.
+    # Almost every paragraph misses here, before anything else is checked
+    node = trie.get(text[:1])
+    if node is None or not text.endswith(":"):
+        return None
+    for char in text[1:-1]:
+        node = node.get(char)
+        if node is None:
+            return None
+    return node.get(None)
+
+
+def dump_orjson(doc):
+    """
+    Writes the document to stdout as JSON using orjson, which serializes
+    it faster than the json module used by panflute.dump. The document is
+    still read by panflute.load
+    :param doc:
+    :return:
+    """
+    sys.stdout.buffer.write(orjson.dumps(doc.to_json()))
+
+
 def main_test(doc=None):
     file_name = "test_admonition.json"
     file = open(file_name, "r")
@@ -154,12 +234,19 @@ def main_test(doc=None):
 
 
 def main(doc=None):
-    return run_filter(action,
-                      prepare=prepare,
-                      finalize=finalize,
-                      doc=doc)
+    if doc is not None or orjson is None:
+        return run_filter(action,
+                          prepare=prepare,
+                          finalize=finalize,
+                          doc=doc)
+
+    doc = run_filter(action,
+                     prepare=prepare,
+                     finalize=finalize,
+                     doc=load())
+    dump_orjson(doc)
 
 
 if __name__ == '__main__':
-    main_test()
-    # main()
+    # main_test()
+    main()
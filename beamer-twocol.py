@@ -45,8 +45,16 @@ University of Brasilia (UnB) - Brazil
 
 """
 
+import sys
 from panflute import *
 
+# orjson is optional. When installed it writes the resulting JSON document,
+# otherwise panflute does
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 DIVNAME="twocol"
 
@@ -67,24 +75,21 @@ def action(elem, doc):
     """
     # Works only for beamer
     if doc.format != 'beamer':
-        pass
+        return
 
     # Skip non Div elements
-    if not isinstance(elem, Div):
+    if type(elem) is not Div:
         return
 
-    if elem.classes[0] != DIVNAME:
+    if not elem.classes or elem.classes[0] != DIVNAME:
         return
 
     # Finding an horizontal line and recording its position
-    ruler_pos = [i for i,d in enumerate(elem.content) if isinstance(d,HorizontalRule)]
-    if not len(ruler_pos):
-        debug(f"No ruler in this div!!! {ruler_pos}")
+    # The scan stops at the first ruler
+    ruler_pos = next((i for i,d in enumerate(elem.content) if isinstance(d,HorizontalRule)), -1)
+    if ruler_pos < 0:
+        debug("No ruler in this div!!!")
         return
-    else:
-        ruler_pos = ruler_pos[0]
-
-    num_elements = len(elem.content)
 
     #
     # Processing attributes: if given attributes align and width
@@ -92,21 +97,22 @@ def action(elem, doc):
     # The values should be inside quotes and comma-separated
     # align="top,bottom" width="20%,80%"
     # align="bottom" --> in this case BOTH columns get the same value
-    cols_attributes = process_attributes(elem.attributes)
+    # The div attributes are copied once, so elem.attributes is not changed
+    # while the columns are built
+    base = dict(elem.attributes)
+    left_extra, right_extra = process_attributes(base)
+    left_attributes = base.copy()
+    left_attributes.update(left_extra)
+    right_attributes = base.copy()
+    right_attributes.update(right_extra)
 
     # Changing the class from FILTERNAME to "columns", which is later processed by beamer converter
     elem.classes[0] = "columns"
     # Take all elements up to the horizontal line and creating a new div
-    beforeContent = [elem.content[i] for i in range(ruler_pos)]
-    beforeDiv = Div(*beforeContent,classes=["column"], attributes={**elem.attributes,**cols_attributes['left']})
+    beforeDiv = Div(*elem.content[:ruler_pos],classes=["column"], attributes=left_attributes)
 
     # Enclose in div After the ruler
-    if ruler_pos<num_elements:
-        # elem.content.insert(ruler_pos,afterDiv)
-        afterContent = [elem.content[i] for i in range(ruler_pos+1,num_elements)]
-        afterDiv = Div(*afterContent,classes=["column"], attributes={**elem.attributes,**cols_attributes['right']})
-    else:
-        afterDiv = []
+    afterDiv = Div(*elem.content[ruler_pos+1:],classes=["column"], attributes=right_attributes)
 
     # Joinining both contents
     contents = [
@@ -121,34 +127,33 @@ def finalize(doc):
 
 def process_attributes(attributes):
     """
-    Processes the attribute string (only align and width) to create left and right values
-    :param attributes:
-    :return:
+    Processes the attribute string (only align and width) to create left and right values.
+    The values are split at the first comma and, without a comma, both columns get the
+    same value. The processed attributes are removed from the given dict
+    :param attributes: dict with the div attributes
+    :return: tuple with the left and right column values
     """
-    shared_attributes = {'left': {}, 'right': {}}
-    for i in ["align", "width"]:
-        if i not in attributes:
+    left, right = {}, {}
+    for name in ("align", "width"):
+        value = attributes.pop(name, None)
+        if value is None:
             continue
-        split_attributes(attributes[i],i, shared_attributes)
-        del attributes[i]
+        left_value, sep, right_value = value.partition(",")
+        left[name] = left_value
+        right[name] = right_value if sep else left_value
 
-    return shared_attributes
+    return left, right
 
-def split_attributes(attr,attr_name,shared_attr):
+def dump_orjson(doc):
     """
-    Called by process_attributes. Performs actual attribute string parsing and splitting
-    :param attr:
-    :param attr_name:
-    :param shared_attr:
+    Writes the document to stdout as JSON using orjson, which serializes
+    it faster than the json module used by panflute.dump. The document is
+    still read by panflute.load
+    :param doc:
     :return:
     """
-    attrs = attr.split(",", maxsplit=2)
-    shared_attr['left'].update({f"{attr_name}": attrs[0]})
-    split_pos=0
-    if len(attrs)>1:
-        split_pos=1
-    shared_attr['right'].update({f"{attr_name}": attrs[split_pos]})
-    # return split_attribute
+    sys.stdout.buffer.write(orjson.dumps(doc.to_json()))
+
 
 def main_test(doc=None):
     file_name = "test_col.json"
@@ -163,10 +168,17 @@ def main_test(doc=None):
 
 
 def main(doc=None):
-    return run_filter(action,
-                      prepare=prepare,
-                      finalize=finalize,
-                      doc=doc)
+    if doc is not None or orjson is None:
+        return run_filter(action,
+                          prepare=prepare,
+                          finalize=finalize,
+                          doc=doc)
+
+    doc = run_filter(action,
+                     prepare=prepare,
+                     finalize=finalize,
+                     doc=load())
+    dump_orjson(doc)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+"""
+Pandoc filter that applies all the filters in this directory in a single run:
+
+    adoc-admonitions.py
+    beamer-twocol.py
+    divs-to-latex.py
+    super-links.py
+
+Chaining the filters in the command line makes pandoc serialize the document
+to JSON and parse it back once per filter, and each filter walks the whole
+document again. Here the document is loaded once, the metadata of every
+filter (adoc-admonition, super-links, div-env) is read once in prepare
+and each element is visited only once, being handed to the actions of the
+filters interested in its type:
+
+    Para -> adoc-admonitions
+    Div  -> beamer-twocol, then divs-to-latex
+    Span -> super-links
+
+The filters are configured by the same metadata blocks described in each
+one of them. The results may differ from chaining the filters, because
+panflute walks the document bottom-up, visiting the children of an element
+before the element itself:
+
+* The super-links Spans of a paragraph are already Links when the paragraph
+  reaches adoc-admonitions, so the admonition text gets the displayed link
+  text, with its before/after text. With the chained filters
+  (adoc-admonitions first) the admonition gets the plain span text.
+
+* Elements created by an action are not visited again. Only the replacement
+  returned for a Div is handed to the next Div action, so divs-to-latex gets
+  the "columns" Div made by beamer-twocol, but not the "column" Divs inside it.
+
+## Installation
+
+Place this file in the same directory as the other filters:
+
+    ~/.pandoc/filters
+
+Optionally, install orjson to write the resulting pandoc document faster
+
+    pip3 install orjson
+
+
+## Usage in pandoc
+
+    pandoc -s test.md  -t beamer --filter combined-filter.py
+
+which replaces
+
+    pandoc -s test.md  -t beamer --filter adoc-admonitions.py --filter beamer-twocol.py \
+        --filter divs-to-latex.py --filter super-links.py
+
+# Author
+
+    Prof. Georgios Pappas Jr
+    University of Brasilia (UnB) - Brazil
+
+"""
+
+import importlib.util
+import os
+import sys
+from panflute import *
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The filters applied and the element type handled by each one. Filters
+# handling the same type are called in this order for each element
+FILTERS = [
+        ("adoc-admonitions.py", Para),
+        ("beamer-twocol.py"   , Div),
+        ("divs-to-latex.py"   , Div),
+        ("super-links.py"     , Span)
+]
+
+
+def load_filter(file_name):
+    """
+    Imports one of the filter scripts, which sit in the same directory as this one.
+    Their file names are not valid module names, so they are loaded by path
+    :param file_name:
+    :return: the filter module
+    """
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), file_name)
+    spec = importlib.util.spec_from_file_location(file_name[:-3].replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+MODULES = []
+# Actions of the filters, by the element type they handle
+ACTIONS = {}
+for file_name, elem_type in FILTERS:
+    module = load_filter(file_name)
+    MODULES.append(module)
+    ACTIONS.setdefault(elem_type, []).append(module.action)
+
+
+def prepare(doc):
+    """
+    Runs the prepare of every filter, which reads its metadata into the doc
+    :param doc:
+    :return:
+    """
+    for module in MODULES:
+        module.prepare(doc)
+
+
+def action(elem, doc):
+    """
+    Calls the actions of the filters that handle the element type. When
+    an action replaces the element, the following actions get the replacement;
+    when it returns a list of elements, it is returned right away
+    :param elem:
+    :param doc:
+    :return:
+    """
+    altered = None
+    for filter_action in ACTIONS.get(type(elem), ()):
+        result = filter_action(elem, doc)
+        if result is None:
+            continue
+        if not isinstance(result, Element):
+            return result
+        elem = altered = result
+
+    return altered
+
+
+def finalize(doc):
+    for module in MODULES:
+        module.finalize(doc)
+
+
+def main(doc=None):
+    if doc is not None or orjson is None:
+        return run_filter(action,
+                          prepare=prepare,
+                          finalize=finalize,
+                          doc=doc)
+
+    doc = run_filter(action,
+                     prepare=prepare,
+                     finalize=finalize,
+                     doc=load())
+    # Writing the result with orjson, as the filters do
+    sys.stdout.buffer.write(orjson.dumps(doc.to_json()))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,15 @@
 Pandoc filter for adding LaTeX environment on specific div
 """
 
+import sys
 from panflute import *
 
-META = {}
+# orjson is optional. When installed it writes the resulting JSON document,
+# otherwise panflute does
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 md = """---
 pandoc-latex-environment:
@@ -37,7 +43,14 @@ ubuntu div
 
 
 def prepare(doc):
-    pass
+    """
+    Reads the div-env metadata, mapping the div classes to the latex
+    environments, once per document
+    :param doc:
+    :return:
+    """
+    doc._divenv = doc.get_metadata('div-env', None) or {}
+    doc._divenv_keys = frozenset(doc._divenv)
 
 
 def action(elem, doc):
@@ -49,20 +62,16 @@ def action(elem, doc):
     """
     # Works only for Latex
     if doc.format not in ['beamer', 'latex']:
-        pass
+        return
 
     # Skip non Div elements
-    if not isinstance(elem, Div):
+    if type(elem) is not Div:
         return
 
-    # getting the document metadata. First checking if META is defined
-    try:
-        META
-    except NameError:
-        META = doc.get_metadata('div-env', None)
-    finally:
-        if not META:
-            return
+    # getting the document metadata, read in prepare
+    META = doc._divenv
+    if not META:
+        return
 
     attributes = elem.attributes
 
@@ -70,7 +79,7 @@ def action(elem, doc):
     # Checks if one of the div classes is in the metadata
     # Otherwise the Div is unchanged
     #
-    if not (len(elem.classes) and elem.classes[0] in META):
+    if not (len(elem.classes) and elem.classes[0] in doc._divenv_keys):
         return
     div = elem.classes[0]
     env = META[div]
@@ -78,25 +87,29 @@ def action(elem, doc):
     # Getting the label, which is the div id ( ::: {#div .env} )
     label = ''
     if elem.identifier != '':
-        label = '\\label{' + elem.identifier + '}'
+        label = f"\\label{{{elem.identifier}}}"
 
     if 'title' in attributes:
         title = f"[{attributes['title']}]"
     else:
         title = ''
 
-    # Temporarily filling some properties in a temporary doc attribute (called div)
-    doc.div = (env, title, label)
-    # Finding the first paragraph and adding the opening environment statement
-    # This is required to avoid an extra line inserted after the opening
+    # Adding the opening environment statement at the start of the first
+    # paragraph. This is required to avoid an extra line inserted after the opening
     #
     #   Adding like this, causes this side effect
     #       before = Plain(RawInline(format='tex', text='\\begin{' + env + '}' + title + label))
     #       elem.content.insert(0,before)
-    elem.walk(add_before_first_paragraph, doc)
+    #
+    # so a separate Plain is only used when the Div does not start with a paragraph
+    before = latex(f"\\begin{{{env}}}{title}{label}")
+    if len(elem.content) and isinstance(elem.content[0], (Para, Plain)):
+        elem.content[0].content.insert(0, before)
+    else:
+        elem.content.insert(0, Plain(before))
 
     # Adding a last Plain element containing the closing statement as a RawLatex string
-    after = Plain(RawInline(format='tex', text='\\end{' + env + '}'))
+    after = Plain(RawInline(format='tex', text=f"\\end{{{env}}}"))
 
     elem.content.append(after)
 
@@ -114,32 +127,15 @@ def latex(txt=""):
     return RawInline(format='tex', text=txt)
 
 
-def add_before_first_paragraph(elem, doc):
+def dump_orjson(doc):
     """
-    Gets the first paragraph of the Div and adds
-    a latex inline before the first paragraph
-    This avoids an extra newline after the environment opening,
-    which causes a side effect when displaying source code
-    :param elem:
+    Writes the document to stdout as JSON using orjson, which serializes
+    it faster than the json module used by panflute.dump. The document is
+    still read by panflute.load
     :param doc:
     :return:
     """
-
-    # Double-checking the presence of added data in "div" field
-    if not hasattr(doc, "div"):
-        return
-    if type(elem) == Para:
-        # Getting the required data
-        env, title, label = doc.div
-        before = latex('\\begin{' + env + '}' + title + label)
-        # before = RawInline(format='tex', text='\\begin{' + env + '}' + title + label)
-        elem.content.insert(0, before)
-
-        # Removing the temporary data
-        del doc.div
-        return elem
-    else:
-        pass
+    sys.stdout.buffer.write(orjson.dumps(doc.to_json()))
 
 
 def main_test(doc=None):
@@ -155,10 +151,17 @@ def main_test(doc=None):
 
 
 def main(doc=None):
-    return run_filter(action,
-                      prepare=prepare,
-                      finalize=finalize,
-                      doc=doc)
+    if doc is not None or orjson is None:
+        return run_filter(action,
+                          prepare=prepare,
+                          finalize=finalize,
+                          doc=doc)
+
+    doc = run_filter(action,
+                     prepare=prepare,
+                     finalize=finalize,
+                     doc=load())
+    dump_orjson(doc)
 
 
 if __name__ == '__main__':
@@ -65,16 +65,16 @@ following results, using the HTML output format:
     -> <p><a href="https://hello.co/FOO" class="foo">FOO</a></p>
 
     [Some text]{#l type=other}
-    -> <p><a href="HTTP://foo.com//Some+text" type="other">SOMETEXT:Some text&lt;–AFTER</a></p>
+    -> <p><a href="HTTP://foo.com/Some+text">SOMETEXT:Some text&lt;–AFTER</a></p>
 
     [1233211]{#l type=pubmed}
-    -> <p><a href="https://pubmed.ncbi.nlm.nih.gov//1233211" type="pubmed">pubmed:1233211</a></p>
+    -> <p><a href="https://pubmed.ncbi.nlm.nih.gov/1233211">pubmed:1233211</a></p>
 
     [Arabidopsis_thaliana]{#l .wiki title="Arabidopsis thaliana" before="WIKI:"}
-    -> <p><a href="https://en.wikipedia.org/wiki//Arabidopsis_thaliana" class="wiki" title="Arabidopsis thaliana" data-before="WIKI:">WIKI:Arabidopsis thaliana</a></p>
+    -> <p><a href="https://en.wikipedia.org/wiki/Arabidopsis_thaliana" class="wiki" title="Arabidopsis thaliana">WIKI:Arabidopsis thaliana</a></p>
 
     [10.1007/978-1-4613-8850-0_3]{#l .doi}
-    -> <p><a href="https://doi.org//10.1007/978-1-4613-8850-0_3" class="doi">DOI:10.1007/978-1-4613-8850-0_3</a></p>
+    -> <p><a href="https://doi.org/10.1007/978-1-4613-8850-0_3" class="doi">DOI:10.1007/978-1-4613-8850-0_3</a></p>
 
 
 ## Advantages
@@ -99,6 +99,10 @@ With filter
 
     pip3 install panflute
 
+   Optionally, install orjson to write the resulting pandoc document faster
+
+    pip3 install orjson
+
 3. Download and place the file in directory:
 
     ~/.pandoc/filters
@@ -116,9 +120,19 @@ With filter
     Last modification: Sun Jan  2 21:11:25 -03 2022
 
 """
-import urllib.parse
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import quote_plus
+import sys
 from panflute import *
 
+# orjson is optional. When installed it writes the resulting JSON document,
+# otherwise panflute does
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # The default filter name to appear in the metadata block
 FILTERNAME = "super-links"
 IDNAME = "l"
@@ -143,9 +157,32 @@ LINKS = {
         "youtube": "https://www.youtube.com/"
 }
 
+# Span attributes consumed by the filter, which are not copied to the link
+LINK_OPTIONS = frozenset(["type", "title", "before", "after"])
+
+# Normalized form of a LINKS entry. The url always ends with a slash
+LinkSpec = namedtuple("LinkSpec", ["url", "encode", "before", "after"])
+
+# The same link texts (e.g. DOIs) tend to be repeated, so the encoding is memoized
+encode_link = lru_cache(maxsize=1024)(quote_plus)
+
 
 def prepare(doc):
-    pass
+    """
+    Merges the default LINKS with the document metadata, once per document,
+    and normalizes every entry into a LinkSpec. Invalid entries are reported
+    and dropped, so the spans using them are left unchanged
+    :param doc:
+    :return:
+    """
+    links = {**LINKS, **doc.get_metadata(FILTERNAME, {})}
+    doc._links = {}
+    for link_type, url_data in links.items():
+        spec = normalize_link(url_data)
+        if spec is None:
+            debug(f"{FILTERNAME}: ignoring link type '{link_type}' without an url")
+            continue
+        doc._links[link_type] = spec
 
 
 def action(elem, doc):
@@ -159,66 +196,48 @@ def action(elem, doc):
     :return:
     """
 
-    # Skip non Div elements
-    if not isinstance(elem, Span):
+    # Skip non Span elements
+    if type(elem) is not Span:
         return
 
-    #
-    # getting the document metadata. To guarantee that this procedure is executed only once
-    # check if variable META is defined in the global scope. Then gets the variable
-    # from markdown metadata and merge with the default LINKS dict
-    #
-    if 'META' not in globals():
-        META = doc.get_metadata(FILTERNAME, {})
-        # Merging admonition names and types with metadata
-        globals()['LINKS'] = {**LINKS, **META}
-        globals()['META'] = META
-
-    # Checking if the exact ID and if at least one class were provided
+    # Checking if the exact ID is provided. Most spans stop here, before
+    # any attribute or class is looked at
     if elem.identifier != IDNAME:
         return
 
-    # The type should be a key in the LINKS dict. Initially, we hove none
-    type = ""
+    # The type should be a key in the LINKS dict
     # Now the link url selection is performed
     # First check for the presence of an attribute named "type"
     # {#l type=wiki}
-    try:
-        type = get_option(elem.attributes, "type")
-    except ValueError:
+    link_type = elem.attributes.get("type")
+    if link_type is None:
         # If type not present, then use the first class for the URL selection
         # {#l .wiki}
-        if len(elem.classes):
-            type = elem.classes[0]
+        link_type = elem.classes[0] if len(elem.classes) else ""
 
     # Getting the class, which should correspond to one of the
     # elements provided in the links dictionary
-    if type not in LINKS:
+    if link_type not in doc._links:
         return
 
     # Creating the URL and text shown, based on the given
     # attributes.
-    (text, url) = get_link_text(type, elem)
+    (text, url) = get_link_text(link_type, elem, doc)
 
     # Getting the span text
     # text = stringify(elem)
     # Getting the url from LINKS
     # url  = LINKS[type]
 
-    # Removing the identifier
-    elem.identifier = ""
-    # Getting the link string to add to the end of the URL
-    # Initially we take the text content
-    # title=""
-    # try:
-    #     title = get_option(elem.attributes, "title")
-    # except:
-    #     title=""
+    # The options used to build the link are not copied to it. The title
+    # attribute becomes the link title
+    attributes = {key: value for key, value in elem.attributes.items()
+                  if key not in LINK_OPTIONS}
 
     newlink = Link(Str(text), url=url,
                    classes=elem.classes,
-                   attributes=elem.attributes,
-                   # title=title
+                   attributes=attributes,
+                   title=elem.attributes.get('title', '')
                    )
     # Getting the text
     return newlink
@@ -228,47 +247,69 @@ def finalize(doc):
     pass
 
 
-def get_link_text(type, elem):
+def normalize_link(url_data):
+    """
+    Converts a LINKS entry, either an URL string or a dict with the url,
+    encode, before and after keys, into a LinkSpec
+    :param url_data:
+    :return: LinkSpec or None if url_data is not a valid entry
+    """
+    if isinstance(url_data, str):
+        url_data = {"url": url_data}
+    if not isinstance(url_data, dict) or not isinstance(url_data.get('url'), str):
+        return None
+    url = url_data['url']
+    if not url.endswith("/"):
+        url = url + "/"
+    return LinkSpec(url,
+                    bool(url_data.get("encode")),
+                    url_data.get("before", ""),
+                    url_data.get("after", ""))
+
+
+def get_link_text(link_type, elem, doc):
     """
 
-    :param type:
+    :param link_type:
     :param elem:
+    :param doc:
     :return:
     """
-    # Getting the span text
-    link_text = stringify(elem)
-    # Getting the url from LINKS
-    url_data = LINKS[type]
-    title = elem.attributes.get('title')
-    url = ""
-
-    if isinstance(url_data, str):
-        slash = "" if url_data.endswith("/") else "/"
-        url = url_data + slash + link_text
-        if title:
-            link_text = title
-    elif isinstance(url_data, dict):
-        slash = "" if url_data['url'].endswith("/") else "/"
-        # Encoding the URL in case encode attribute is set
-        if url_data.get("encode"):
-            encoded_text = urllib.parse.quote_plus(link_text)
-            url = url_data['url'] + slash + encoded_text
-        else:
-            url = url_data['url'] + slash + link_text
-
-        if title:
-            link_text = title
-
-        prepend = url_data.get('before', "")
-        prepend = elem.attributes.get('before', prepend)
-        link_text = prepend + link_text
-        append = url_data.get('after', "")
-        append = elem.attributes.get('after', append)
-        link_text = link_text + append
+    # Getting the span text. Usually the span holds a single Str
+    content = elem.content
+    if len(content) == 1 and type(content[0]) is Str:
+        link_text = content[0].text
+    else:
+        link_text = stringify(elem)
+    # Getting the normalized link specification
+    url_prefix, encode, before, after = doc._links[link_type]
+    get = elem.attributes.get
+    title = get('title')
+
+    # Encoding the URL in case encode attribute is set
+    text = encode_link(link_text) if encode else link_text
+    url = f"{url_prefix}{text}"
+
+    # The title replaces the displayed text and the span attributes
+    # override the before/after given in the link specification
+    prepend = get('before', before)
+    append = get('after', after)
+    link_text = f"{prepend}{title or link_text}{append}"
 
     return (link_text, url)
 
 
+def dump_orjson(doc):
+    """
+    Writes the document to stdout as JSON using orjson, which serializes
+    it faster than the json module used by panflute.dump. The document is
+    still read by panflute.load
+    :param doc:
+    :return:
+    """
+    sys.stdout.buffer.write(orjson.dumps(doc.to_json()))
+
+
 def main_test(doc=None):
     file_name = "test_links.json"
     file = open(file_name, "r")
@@ -282,12 +323,19 @@ def main_test(doc=None):
 
 
 def main(doc=None):
-    return run_filter(action,
-                      prepare=prepare,
-                      finalize=finalize,
-                      doc=doc)
+    if doc is not None or orjson is None:
+        return run_filter(action,
+                          prepare=prepare,
+                          finalize=finalize,
+                          doc=doc)
+
+    doc = run_filter(action,
+                     prepare=prepare,
+                     finalize=finalize,
+                     doc=load())
+    dump_orjson(doc)
 
 
 if __name__ == '__main__':
-    main_test()
-    # main()
+    # main_test()
+    main()